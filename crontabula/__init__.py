@@ -1,7 +1,10 @@
 import dataclasses
-from typing import List, Iterator, Optional
+import functools
+import itertools
+from typing import Callable, Iterable, List, Iterator, Optional, Tuple
 import datetime
 import calendar
+import re
 
 __all__ = ["Crontab", "parse", "InvalidExpression"]
 
@@ -19,20 +22,82 @@ MACROS = {
 }
 
 
+# Day-of-week names, which can be used in place of numbers
+_DAY_OF_WEEK_NAMES = {
+    "SUN": "0",
+    "MON": "1",
+    "TUE": "2",
+    "WED": "3",
+    "THU": "4",
+    "FRI": "5",
+    "SAT": "6",
+}
+_DAY_OF_WEEK_NAMES_RE = re.compile("|".join(_DAY_OF_WEEK_NAMES), re.IGNORECASE)
+
+# Number of days in each month of a non-leap year, indexed by month number
+_DAYS_IN_MONTH = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+
+# Bit `n` is set for every `n` that is a multiple of 7, up to the last week of a month
+_EVERY_WEEK = sum(1 << day for day in range(0, 35, 7))
+
+
 class InvalidExpression(ValueError):
     pass
 
 
 @dataclasses.dataclass(frozen=True)
 class Crontab:
-    minutes: List[int]
-    hours: List[int]
-    day_of_month: List[int]
-    months: List[int]
-    day_of_week: List[int]
+    minutes: Tuple[int, ...]
+    hours: Tuple[int, ...]
+    day_of_month: Tuple[int, ...]
+    months: Tuple[int, ...]
+    day_of_week: Tuple[int, ...]
     day_of_month_asterisk: bool
     day_of_week_asterisk: bool
 
+    # Bitmask representations of the fields above, where bit `n` is set if `n` is matched
+    minutes_mask: int = dataclasses.field(init=False, repr=False, compare=False)
+    hours_mask: int = dataclasses.field(init=False, repr=False, compare=False)
+    dom_mask: int = dataclasses.field(init=False, repr=False, compare=False)
+    months_mask: int = dataclasses.field(init=False, repr=False, compare=False)
+    dow_mask: int = dataclasses.field(init=False, repr=False, compare=False)
+
+    # The days of a month that match `day_of_week`, indexed by the weekday of the 1st
+    _weekday_masks: Tuple[int, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    # Returns the matching days of a given month, chosen once based on which of the day
+    # of month and day of week fields are restricted
+    _month_days: Callable[
+        ["Crontab", int, int, int], Iterable[int]
+    ] = dataclasses.field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # The dataclass is frozen, so the derived fields must be set with object.__setattr__
+        object.__setattr__(self, "minutes_mask", _to_mask(self.minutes))
+        object.__setattr__(self, "hours_mask", _to_mask(self.hours))
+        object.__setattr__(self, "dom_mask", _to_mask(self.day_of_month))
+        object.__setattr__(self, "months_mask", _to_mask(self.months))
+        object.__setattr__(self, "dow_mask", _to_mask(self.day_of_week))
+        object.__setattr__(
+            self,
+            "_weekday_masks",
+            tuple(
+                _month_weekday_mask(self.dow_mask, first_weekday)
+                for first_weekday in range(7)
+            ),
+        )
+
+        if self.day_of_week_asterisk:
+            month_days = _month_days_matching_day_of_month
+        elif self.day_of_month_asterisk:
+            month_days = _month_days_matching_day_of_week
+        else:
+            month_days = _month_days_matching_either
+        object.__setattr__(self, "_month_days", month_days)
+
     @property
     def next(self) -> datetime.datetime:
         """
@@ -44,6 +109,18 @@ class Crontab:
         """
         return next(self.date_times())
 
+    def next_n(
+        self, n: int, start: Optional[datetime.datetime] = None
+    ) -> List[datetime.datetime]:
+        """
+        Return the next `n` times at which this crontab should execute
+
+        >>> crontab = parse("*/10 * * * *")
+        >>> crontab.next_n(3)
+        [datetime.datetime(...), datetime.datetime(...), datetime.datetime(...)]
+        """
+        return list(itertools.islice(self.date_times(start), n))
+
     def date_times(
         self, start: Optional[datetime.datetime] = None
     ) -> Iterator[datetime.datetime]:
@@ -57,75 +134,101 @@ class Crontab:
         """
         anchor = start if start else datetime.datetime.now()
         anchor_date = anchor.date()
+        anchor_hour, anchor_minute = anchor.hour, anchor.minute
 
-        for day in self.dates(anchor_date):
-            is_start_day = day == anchor_date
+        hours, minutes = self.hours, self.minutes
 
-            for hour in self.hours:
-                is_start_hour = is_start_day and hour == anchor.hour
+        for day in self.dates(anchor_date):
+            year, month, day_of_month = day.year, day.month, day.day
+
+            if day == anchor_date:
+                # On the start day jump straight to the first hour at or after the
+                # anchor. Only the anchor hour itself needs its minutes filtering.
+                for hour in _bits_from(self.hours_mask, anchor_hour):
+                    if hour == anchor_hour:
+                        hour_minutes = _bits_from(self.minutes_mask, anchor_minute)
+                    else:
+                        hour_minutes = minutes
 
-                if is_start_day and hour < anchor.hour:
-                    continue
+                    for minute in hour_minutes:
+                        yield datetime.datetime(year, month, day_of_month, hour, minute)
+                continue
 
-                for minute in self.minutes:
-                    if is_start_hour and minute < anchor.minute:
-                        continue
+            for hour in hours:
+                for minute in minutes:
+                    yield datetime.datetime(year, month, day_of_month, hour, minute)
 
-                    yield datetime.datetime(
-                        year=day.year,
-                        month=day.month,
-                        day=day.day,
-                        hour=hour,
-                        minute=minute,
-                    )
+    def occurrences_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> List[datetime.datetime]:
+        """
+        Return all points in time between `start` and `end` (inclusive) that this crontab
+        expression points to.
+
+        >>> crontab = parse("0 */12 * * *")
+        >>> crontab.occurrences_between(
+        ...     datetime.datetime(2022, 1, 1), datetime.datetime(2022, 1, 2)
+        ... )
+        [datetime.datetime(2022, 1, 1, 0, 0), datetime.datetime(2022, 1, 1, 12, 0), datetime.datetime(2022, 1, 2, 0, 0)]
+        """
+        # date_times() ignores seconds, so it can yield the minute containing `start`
+        date_times = itertools.dropwhile(
+            lambda date_time: date_time < start, self.date_times(start)
+        )
+        return list(itertools.takewhile(lambda date_time: date_time <= end, date_times))
 
-    def dates(self, start: Optional[datetime.date] = None) -> Iterator[datetime.date]:
+    def dates(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> Iterator[datetime.date]:
         """
-        Infinitely yield future dates that this crontab expression points to. For example:
+        Yield future dates that this crontab expression points to, up to and including `end`
+        if given, or infinitely otherwise. For example:
 
         >>> import itertools
         >>> crontab = parse("*/10 * * * *")
         >>> list(itertools.islice(crontab.dates(), 3))
         [datetime.date(...), datetime.date(...), datetime.date(...)]
         """
-        cal = calendar.Calendar()
         anchor = start if start else datetime.date.today()
-        while True:
-            for month in self.months:
-                if month < anchor.month:
-                    continue
-
-                for day_of_month, day_of_week in cal.itermonthdays2(anchor.year, month):
-                    # itermonthdays yields all days required to get a full week,
-                    # but those outside the current month are 0
-                    if day_of_month == 0:
+        end = end if end else datetime.date.max
+        year, anchor_month, anchor_day = anchor.year, anchor.month, anchor.day
+        end_year, end_month = end.year, end.month
+
+        # Avoid repeated attribute lookups inside the loops below
+        all_months, month_days = self.months, self._month_days
+
+        # In the first year, jump straight to the first month at or after the anchor
+        months = _bits_from(self.months_mask, anchor_month)
+        while year <= end_year:
+            for month in months:
+                if year == end_year and month > end_month:
+                    return
+
+                days_in_month = _DAYS_IN_MONTH[month] + (
+                    month == 2 and calendar.isleap(year)
+                )
+
+                for day_of_month in month_days(self, year, month, days_in_month):
+                    if month == anchor_month and day_of_month < anchor_day:
                         continue
 
-                    if month == anchor.month and day_of_month < anchor.day:
-                        continue
-
-                    day_of_month_match = day_of_month in self.day_of_month
-                    day_of_week_match = (
-                        _day_of_week_to_cron(day_of_week) in self.day_of_week
-                    )
-
-                    if self.day_of_week_asterisk:
-                        if not day_of_month_match:
-                            continue
-                    elif self.day_of_month_asterisk:
-                        if not day_of_week_match:
-                            continue
-                    else:
-                        if not day_of_month_match and not day_of_week_match:
-                            continue
+                    date = datetime.date(year, month, day_of_month)
+                    if date > end:
+                        return
+                    yield date
 
-                    yield datetime.date(anchor.year, month, day_of_month)
-            anchor = datetime.date(year=anchor.year + 1, month=1, day=1)
+            # Every following year is matched from the 1st of January
+            year, anchor_month, anchor_day = year + 1, 1, 1
+            months = all_months
 
 
+@functools.lru_cache(maxsize=1024)
 def parse(expression: str) -> Crontab:
     """
-    Parse a crontab expression into a Crontab object.
+    Parse a crontab expression into a Crontab object. Results are cached, so repeatedly
+    parsing the same expression returns the same (immutable) Crontab object.
 
     >>> parse("*/10 * * * *")
     Crontab(...)
@@ -133,7 +236,8 @@ def parse(expression: str) -> Crontab:
     # Resolve macros (@hourly etc) to equivalent cron expressions
     expression = MACROS.get(expression, expression)
 
-    parts = expression.split(" ")
+    # Components can be separated by any run of whitespace, i.e tabs or multiple spaces
+    parts = expression.split()
     if len(parts) != 5:
         raise InvalidExpression(f'"{expression}" does not have 5 components')
 
@@ -143,7 +247,14 @@ def parse(expression: str) -> Crontab:
     hours = _expression_to_list(hour_expr, max_value=23)
     day_months = _expression_to_list(day_month_expr, max_value=31, min_value=1)
     months = _expression_to_list(month_expr, max_value=12, min_value=1)
-    day_weeks = _expression_to_list(day_week_expr, max_value=6)
+    day_weeks = _expression_to_list(_handle_text_day_week(day_week_expr), max_value=6)
+
+    # Without a day of week, dates() only visits the listed days of each month. If none
+    # of them exist in any listed month (i.e `0 0 30 2 *`) it would search forever.
+    if day_week_expr == "*" and not any(
+        day_months[0] <= _DAYS_IN_MONTH[month] + (month == 2) for month in months
+    ):
+        raise InvalidExpression(f'"{expression}" never matches a valid date')
 
     return Crontab(
         minutes,
@@ -156,47 +267,56 @@ def parse(expression: str) -> Crontab:
     )
 
 
+@functools.lru_cache(maxsize=256)
 def _expression_to_list(
-    expr: str, max_value: int, *, min_value: int = 0, step: int = 1
-) -> List[int]:
-    # Simple recursive crontab expression parser.
-
-    # Expressions can be delimited by commas. If this is the case call `_expression_to_list` with each
-    # sub-expression, then combine and sort the results into a single list.
-    if "," in expr:
-        values = {
-            minute
-            for sub_expr in expr.split(",")
-            for minute in _expression_to_list(
-                sub_expr, max_value, min_value=min_value, step=step
-            )
-        }
-        return list(sorted(values))
-    elif expr == "*":
-        # Return all possible values
-        return list(range(min_value, max_value + 1, step))
-    elif expr.isnumeric():
-        # Return the single numeric value
-        return [_try_int(expr, max_value=max_value, min_value=min_value)]
-    elif "/" in expr:
+    expr: str, max_value: int, *, min_value: int = 0
+) -> Tuple[int, ...]:
+    # Simple single-pass crontab expression parser. Common field expressions like `*`
+    # and `*/5` are shared between many crontabs, so the (immutable) results are cached.
+
+    # Expressions can be delimited by commas. Each sub-expression sets bits in a bitset,
+    # which de-duplicates and orders the combined values without any sorting.
+    bitset = 0
+    for sub_expr in expr.split(","):
         # The rhs of an expression containing a / is the "step" value, i.e `*/3` means
         # every 3 minutes
-        lhs, rhs = expr.split("/")
-        rhs_step = _try_int(rhs, max_value=max_value, min_value=min_value)
-        return _expression_to_list(lhs, max_value, step=rhs_step, min_value=min_value)
-    elif "-" in expr:
-        # Expressions containing - represent two values, x-y. x must be less than y, but this
-        # isn't currently checked.
-        range_start, range_end = expr.split("-")
-        return list(
-            range(
-                _try_int(range_start, max_value, min_value),
-                _try_int(range_end, max_value, min_value) + 1,
-                step,
-            )
-        )
+        value_expr, has_step, step_expr = sub_expr.partition("/")
+        step = 1
+        if has_step:
+            step = _try_int(step_expr, max_value=max_value, min_value=min_value)
+            if step == 0:
+                raise InvalidExpression(f"Invalid step: {sub_expr}")
+
+        if value_expr == "*":
+            # All possible values
+            range_start, range_end = min_value, max_value
+        elif value_expr.isnumeric():
+            # A single numeric value
+            bitset |= 1 << _try_int(value_expr, max_value, min_value)
+            continue
+        elif "-" in value_expr:
+            # Expressions containing - represent two values, x-y. x must not be greater than y.
+            start_expr, _, end_expr = value_expr.partition("-")
+            range_start = _try_int(start_expr, max_value, min_value)
+            range_end = _try_int(end_expr, max_value, min_value)
+            if range_start > range_end:
+                raise InvalidExpression(f"Invalid range: {sub_expr}")
+        else:
+            raise InvalidExpression(f"Invalid expression: {sub_expr}")
+
+        for value in range(range_start, range_end + 1, step):
+            bitset |= 1 << value
+
+    return tuple(
+        value for value in range(min_value, max_value + 1) if bitset >> value & 1
+    )
 
-    raise InvalidExpression(f"Invalid expression: {expr}")
+
+def _handle_text_day_week(day_week_expr: str) -> str:
+    # Replace day names (MON, tue etc) with their numeric equivalent in a single pass
+    return _DAY_OF_WEEK_NAMES_RE.sub(
+        lambda match: _DAY_OF_WEEK_NAMES[match.group(0).upper()], day_week_expr
+    )
 
 
 def _try_int(v, max_value: int, min_value: int) -> int:
@@ -213,6 +333,59 @@ def _try_int(v, max_value: int, min_value: int) -> int:
     return result
 
 
-def _day_of_week_to_cron(day_of_week: int):
-    """Convert Python day-of-week (0 = Monday) to Cron (0 = Sunday)"""
-    return (day_of_week + 1) % 7
+def _to_mask(values: Iterable[int]) -> int:
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+def _month_days_matching_day_of_month(
+    crontab: Crontab, year: int, month: int, days_in_month: int
+) -> Iterable[int]:
+    return [day for day in crontab.day_of_month if day <= days_in_month]
+
+
+def _month_days_matching_day_of_week(
+    crontab: Crontab, year: int, month: int, days_in_month: int
+) -> Iterable[int]:
+    # Look up which days of the month fall on a matching weekday, based on the weekday
+    # of the 1st
+    days_mask = crontab._weekday_masks[datetime.date(year, month, 1).weekday()]
+    return _bits_from(days_mask & (2 << days_in_month) - 1, 1)
+
+
+def _month_days_matching_either(
+    crontab: Crontab, year: int, month: int, days_in_month: int
+) -> Iterable[int]:
+    days_mask = crontab._weekday_masks[datetime.date(year, month, 1).weekday()]
+    days_mask |= crontab.dom_mask
+    return _bits_from(days_mask & (2 << days_in_month) - 1, 1)
+
+
+def _month_weekday_mask(dow_mask: int, first_weekday: int) -> int:
+    """
+    Return a mask of the days of a month starting on `first_weekday` (0 = Monday) that
+    fall on a day of week in `dow_mask` (0 = Sunday)
+    """
+    # The cron day-of-week of `day` is (first_weekday + day) % 7. Build the first week,
+    # then repeat it for every following week.
+    first_week = 0
+    for day in range(1, 8):
+        if dow_mask >> (first_weekday + day) % 7 & 1:
+            first_week |= 1 << day
+    return first_week * _EVERY_WEEK
+
+
+def _bits_from(mask: int, start: int) -> Iterator[int]:
+    """Yield the positions of the bits set in `mask` that are at or after `start`, in order"""
+    mask = mask >> start << start
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length() - 1
+        mask ^= lowest_bit
+
+
+# Pre-populate the parse cache with the predefined macros
+for _macro in MACROS:
+    parse(_macro)
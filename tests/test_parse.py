@@ -23,6 +23,52 @@ def test_parse(expr: str):
     assert v is not None
 
 
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "60 * * * *",
+        "* 24 * * *",
+        "* * 0 * *",
+        "*/0 * * * *",
+        "1,,2 * * * *",
+        "a * * * *",
+        "0 0 30,31 2 *",
+        "0 0 31 4,6,9,11 *",
+        "0 0 10-5 * *",
+        "5-1 * * * *",
+    ],
+)
+def test_parse_invalid(expr: str):
+    with pytest.raises(crontabula.InvalidExpression):
+        crontabula.parse(expr)
+
+
+@pytest.mark.parametrize(
+    "expr, expected",
+    [
+        ("MON", [1]),
+        ("mon-fri", [1, 2, 3, 4, 5]),
+        ("SUN,Sat", [0, 6]),
+        ("*/2,TUE", [0, 2, 4, 6]),
+    ],
+)
+def test_day_of_week_names(expr, expected):
+    result = crontabula.parse(f"0 0 * * {expr}")
+    assert result.day_of_week == tuple(expected), result.day_of_week
+
+
+@pytest.mark.parametrize(
+    "expr", ["*/5  0 * * 1-5", "*/5\t0\t*\t*\t1-5", " */5 0 * * 1-5\n"]
+)
+def test_parse_whitespace(expr: str):
+    assert crontabula.parse(expr) == crontabula.parse("*/5 0 * * 1-5")
+
+
+def test_parse_cached():
+    assert crontabula.parse("*/5 * * * *") is crontabula.parse("*/5 * * * *")
+    assert crontabula.parse("@daily") == crontabula.parse("@midnight")
+
+
 @pytest.mark.parametrize(
     "expr, expected",
     [
@@ -34,7 +80,8 @@ def test_parse(expr: str):
 )
 def test_expr(expr, expected):
     result = crontabula.parse(f"{expr} * * * *")
-    assert result.minutes == expected, result.minutes
+    assert result.minutes == tuple(expected), result.minutes
+    assert result.minutes_mask == sum(1 << minute for minute in expected)
 
 
 @pytest.mark.freeze_time("2022-04-01")
@@ -46,6 +93,21 @@ def test_next():
     assert next_iteration == datetime.datetime(2022, 4, 4, 3, 0)
 
 
+@pytest.mark.freeze_time("2022-04-01 10:42")
+def test_next_n():
+    crontab = crontabula.parse("*/20 * * * *")
+    assert crontab.next_n(4) == [
+        datetime.datetime(2022, 4, 1, 11, 0),
+        datetime.datetime(2022, 4, 1, 11, 20),
+        datetime.datetime(2022, 4, 1, 11, 40),
+        datetime.datetime(2022, 4, 1, 12, 0),
+    ]
+    assert crontab.next_n(2, datetime.datetime(2022, 4, 2, 23, 50)) == [
+        datetime.datetime(2022, 4, 3, 0, 0),
+        datetime.datetime(2022, 4, 3, 0, 20),
+    ]
+
+
 @pytest.mark.freeze_time("2022-03-31 23:00")
 def test_month_end():
     crontab = crontabula.parse("0 20 * * *")
@@ -204,3 +266,67 @@ def test_day_of_week_and_month():
         datetime.date(2022, 2, 25),
         datetime.date(2023, 2, 3),
     ]
+
+
+@pytest.mark.freeze_time("2022-01-01")
+def test_leap_year():
+    crontab = crontabula.parse("0 0 29 2 *")
+    assert list(itertools.islice(crontab.dates(), 3)) == [
+        datetime.date(2024, 2, 29),
+        datetime.date(2028, 2, 29),
+        datetime.date(2032, 2, 29),
+    ]
+
+    crontab = crontabula.parse("0 0 29-31 * *")
+    assert list(itertools.islice(crontab.dates(datetime.date(2023, 1, 30)), 4)) == [
+        datetime.date(2023, 1, 30),
+        datetime.date(2023, 1, 31),
+        datetime.date(2023, 3, 29),
+        datetime.date(2023, 3, 30),
+    ]
+
+
+def test_occurrences_between():
+    crontab = crontabula.parse("30 9 * * 1-5")
+    start = datetime.datetime(2022, 4, 1, 9, 30)
+    end = datetime.datetime(2022, 4, 5, 9, 30)
+    assert crontab.occurrences_between(start, end) == [
+        datetime.datetime(2022, 4, 1, 9, 30),
+        datetime.datetime(2022, 4, 4, 9, 30),
+        datetime.datetime(2022, 4, 5, 9, 30),
+    ]
+    assert crontab.occurrences_between(end, start) == []
+
+    # Times before a start with non-zero seconds are excluded
+    start = datetime.datetime(2022, 4, 1, 9, 30, 45)
+    assert crontab.occurrences_between(start, end) == [
+        datetime.datetime(2022, 4, 4, 9, 30),
+        datetime.datetime(2022, 4, 5, 9, 30),
+    ]
+    assert crontab.occurrences_between(start, start.replace(second=50)) == []
+
+
+def test_dates_end():
+    crontab = crontabula.parse("0 0 1,15 * *")
+    dates = crontab.dates(datetime.date(2022, 1, 10), datetime.date(2022, 3, 1))
+    assert list(dates) == [
+        datetime.date(2022, 1, 15),
+        datetime.date(2022, 2, 1),
+        datetime.date(2022, 2, 15),
+        datetime.date(2022, 3, 1),
+    ]
+    dates = crontab.dates(datetime.date(2022, 1, 10), datetime.date(2022, 1, 14))
+    assert list(dates) == []
+
+
+def test_date_times_day_of_week():
+    # date_times relies on dates() alone to filter the day of week
+    crontab = crontabula.parse("*/30 23 * * 1,3")
+    date_times = crontab.date_times(datetime.datetime(2022, 4, 3, 12, 0))
+    assert list(itertools.islice(date_times, 5)) == [
+        datetime.datetime(2022, 4, 4, 23, 0),
+        datetime.datetime(2022, 4, 4, 23, 30),
+        datetime.datetime(2022, 4, 6, 23, 0),
+        datetime.datetime(2022, 4, 6, 23, 30),
+        datetime.datetime(2022, 4, 11, 23, 0),
+    ]